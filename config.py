@@ -1,6 +1,9 @@
+import itertools
+import os
 import random
+from types import MappingProxyType
 
-USER_AGENT_LIST = [
+USER_AGENT_LIST = (
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Safari/605.1.15',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0',
@@ -8,29 +11,75 @@ USER_AGENT_LIST = [
     'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36',
     'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1',
     'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.144 Mobile Safari/537.36'
-]
+)
+
+_UA_CYCLE = itertools.cycle(random.choices(USER_AGENT_LIST, k=1024))
+
+PLAYWRIGHT_USER_AGENTS = MappingProxyType({
+    "chromium": (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36'
+    ),
+    "firefox": (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0',
+        'Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/119.0',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/119.0'
+    )
+})
+
+_HEADERS_TEMPLATE = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Connection': 'keep-alive',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'DNT': '1'
+}
 
 def get_random_headers():
-    return {
-        'User-Agent': random.choice(USER_AGENT_LIST),
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Connection': 'keep-alive',
-        'Cache-Control': 'no-cache',
-        'Pragma': 'no-cache',
-        'DNT': '1'
-    }
+    headers = _HEADERS_TEMPLATE.copy()
+    headers['User-Agent'] = next(_UA_CYCLE)
+    return headers
 
 REQUESTS_TIMEOUT = 20
 
+HTTP_CONNECTION_LIMIT = 256
+
+HTTP_CONNECTION_LIMIT_PER_HOST = 64
+
+DNS_CACHE_TTL = 300
+
+HTTP_CACHE_DIR = 'cache'
+
+HTTP_READ_CHUNK_SIZE = 64 * 1024
+
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
 REQUESTS_CONCURRENCY_DELAY = (1.0, 3.0)
 
 MAX_RETRIES = 3
 
+RETRY_BACKOFF_INITIAL = 1.0
+
+RETRY_BACKOFF_MAX = 30.0
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+PLAYWRIGHT_MAX_CONCURRENCY = max(2, min(8, os.cpu_count() or 4))
+
+PLAYWRIGHT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+PLAYWRIGHT_WAIT_UNTIL = "commit"
+
+HOST_RATE_LIMIT = 5
+
+HOST_RATE_PERIOD = 1.0
+
 PROXIES = {}
 
 
-PLAYWRIGHT_CONFIGS = {
+PLAYWRIGHT_CONFIGS = MappingProxyType({
     "Jane Street": {
         "url": "https://www.janestreet.com/join-jane-street/open-roles/?type=experienced-candidates&location=all-locations",
         "job_card_selector": "a[href*='/join-jane-street/position/']",
@@ -69,7 +118,9 @@ PLAYWRIGHT_CONFIGS = {
         "link_selector": "a.careers-listing-card",
         "title_selector": "h2", 
         "location_selector": "span.careers-listing-card__location",
-        "requires_interaction": True
+        "requires_interaction": True,
+        "load_stylesheets": True,
+        "wait_until": "domcontentloaded"
     },
     "Two Sigma": {
         "url": "https://www.twosigma.com/careers/open-roles/",
@@ -132,7 +183,8 @@ PLAYWRIGHT_CONFIGS = {
         "job_card_selector": "div.job-list-item",
         "title_selector": "h3",
         "location_selector": "span.job-location",
-        "requires_interaction": True
+        "requires_interaction": True,
+        "wait_until": "domcontentloaded"
     },
     "Coinbase": {
         "url": "https://www.coinbase.com/careers/open-roles",
@@ -141,7 +193,7 @@ PLAYWRIGHT_CONFIGS = {
         "location_selector": "div.location",
         "requires_interaction": True 
     }
-}
+})
 
 GREENHOUSE_FIRMS = [
     "Stripe",
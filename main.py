@@ -1,11 +1,13 @@
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import sys
+from contextlib import AsyncExitStack
+from typing import List, Dict, Any, Callable, Coroutine, Tuple, Set
 
-from config import PLAYWRIGHT_CONFIGS
-from scrapers.requests_scraper import scrape_greenhouse_standard, scrape_custom_site_generic
-from scrapers.playwright_scraper import run_playwright_scrapers
-from utils.file_handler import get_firm_list, export_to_excel
+from config import PLAYWRIGHT_CONFIGS, PLAYWRIGHT_MAX_CONCURRENCY
+from scrapers.requests_scraper import create_http_session, scrape_greenhouse_standard, scrape_custom_site_generic
+from scrapers.playwright_scraper import playwright_browsers, scrape_playwright_firm
+from utils.file_handler import get_firm_list, export_to_excel, job_stream_writer
 
 BOLD = '\033[1m'
 GREEN = '\033[92m'
@@ -15,17 +17,40 @@ CYAN = '\033[96m'
 RED = '\033[91m'
 ENDC = '\033[0m'
 
+if not (sys.stdout.isatty() and sys.stderr.isatty()):
+    BOLD = GREEN = BLUE = YELLOW = CYAN = RED = ENDC = ''
+
 logging.basicConfig(level=logging.INFO, format=f'{YELLOW}[%(levelname)s]{ENDC} %(message)s')
 
 JobData = Dict[str, str]
 FirmConfig = Dict[str, str]
 
+async def run_http_scraper(
+    scraper: Callable[..., Coroutine[Any, Any, List[JobData]]],
+    session: Any,
+    firm_data: FirmConfig
+) -> Tuple[FirmConfig, Any]:
+    try:
+        return firm_data, await scraper(session, firm_data['firm'], firm_data['url'])
+    except Exception as e:
+        return firm_data, e
+
+async def run_playwright_scraper(
+    firm_data: Dict[str, Any],
+    browsers: List[Any],
+    semaphore: asyncio.Semaphore
+) -> Tuple[Dict[str, Any], Any]:
+    try:
+        return firm_data, await scrape_playwright_firm(firm_data, browsers, semaphore)
+    except Exception as e:
+        return firm_data, e
+
 async def run_scrapers(firm_list: List[FirmConfig], use_playwright: bool) -> List[JobData]:
     all_jobs: List[JobData] = []
+    seen_jobs: Set[Tuple[str, str]] = set()
 
-    sync_tasks: List[asyncio.Future] = []
-    sync_firm_map: Dict[int, FirmConfig] = {}
-    initial_async_firms: List[Dict[str, str]] = []
+    sync_jobs: List[Tuple[Callable[..., Coroutine[Any, Any, List[JobData]]], FirmConfig]] = []
+    initial_async_firms: List[FirmConfig] = []
 
     for i, firm_data in enumerate(firm_list):
         try:
@@ -36,20 +61,14 @@ async def run_scrapers(firm_list: List[FirmConfig], use_playwright: bool) -> Lis
             logging.error(f"Configuration error in firm list entry {i}: Missing key {e}. Skipping entry.")
             continue
 
-        playwright_data = {'firm': firm_name}
-
         if platform_type == 'greenhouse':
-            task = asyncio.to_thread(scrape_greenhouse_standard, firm_name, url)
-            sync_tasks.append(task)
-            sync_firm_map[len(sync_tasks) - 1] = firm_data
+            sync_jobs.append((scrape_greenhouse_standard, firm_data))
         elif platform_type == 'custom_site':
-            task = asyncio.to_thread(scrape_custom_site_generic, firm_name, url)
-            sync_tasks.append(task)
-            sync_firm_map[len(sync_tasks) - 1] = firm_data
+            sync_jobs.append((scrape_custom_site_generic, firm_data))
         elif platform_type == 'playwright':
             if use_playwright:
                 if firm_name in PLAYWRIGHT_CONFIGS:
-                    initial_async_firms.append(playwright_data)
+                    initial_async_firms.append(firm_data)
                 else:
                     logging.warning(f"-> Skipping {firm_name}: Playwright requested but config missing in PLAYWRIGHT_CONFIGS.")
             else:
@@ -57,51 +76,86 @@ async def run_scrapers(firm_list: List[FirmConfig], use_playwright: bool) -> Lis
         else:
             logging.warning(f"-> Skipping {firm_name}: Unknown platform_type '{platform_type}'.")
 
-    logging.info(f"\n{BOLD}SCHEDULE:{ENDC} Scheduling {len(sync_tasks)} synchronous scrapers (Greenhouse/Generic)...")
-    fallback_async_firms: List[Dict[str, str]] = []
+    needs_browser = use_playwright and (
+        bool(initial_async_firms)
+        or any(firm['type'] == 'custom_site' and firm['firm'] in PLAYWRIGHT_CONFIGS for _, firm in sync_jobs)
+    )
 
-    if sync_tasks:
-        try:
-            sync_results: List[Any] = await asyncio.gather(*sync_tasks, return_exceptions=True)
+    async with AsyncExitStack() as stack:
+        write_jobs = stack.enter_context(job_stream_writer())
+        browsers = None
+        if needs_browser:
+            try:
+                browsers = await stack.enter_async_context(playwright_browsers())
+            except Exception as e:
+                logging.error(f"Critical failure launching Playwright browser: {type(e).__name__} - {e}. Skipping Playwright scrapers.")
+
+        playwright_semaphore = asyncio.Semaphore(PLAYWRIGHT_MAX_CONCURRENCY)
+        playwright_tasks: Dict[str, asyncio.Task] = {}
+        pending: Set[asyncio.Task] = set()
+
+        def schedule_playwright(firm_data: Dict[str, Any]):
+            if browsers and firm_data['firm'] not in playwright_tasks:
+                task = asyncio.create_task(run_playwright_scraper(firm_data, browsers, playwright_semaphore))
+                playwright_tasks[firm_data['firm']] = task
+                pending.add(task)
 
-            for i, result in enumerate(sync_results):
-                firm_data: Optional[FirmConfig] = sync_firm_map.get(i)
-                if not firm_data:
-                    logging.error(f"Logic error: Could not find firm data for task index {i}. Skipping result.")
-                    continue
+        for firm_data in initial_async_firms:
+            schedule_playwright(firm_data)
+        initial_playwright_count = len(playwright_tasks)
 
+        if initial_playwright_count:
+            logging.info(f"\n{BOLD}SCHEDULE:{ENDC} Started {initial_playwright_count} Playwright scrapers ({PLAYWRIGHT_MAX_CONCURRENCY} at a time)...")
+
+        logging.info(f"\n{BOLD}SCHEDULE:{ENDC} Scheduling {len(sync_jobs)} HTTP scrapers (Greenhouse/Generic)...")
+
+        http_tasks: Set[asyncio.Task] = set()
+        if sync_jobs:
+            try:
+                session = await stack.enter_async_context(create_http_session())
+                http_tasks = {
+                    asyncio.create_task(run_http_scraper(scraper, session, firm_data))
+                    for scraper, firm_data in sync_jobs
+                }
+                pending |= http_tasks
+            except Exception as e:
+                 logging.error(f"Critical error during HTTP task processing: {e}")
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                firm_data, result = task.result()
                 firm_name = firm_data['firm']
+                is_http = task in http_tasks
 
                 if isinstance(result, Exception):
-                    logging.error(f"Error in requests scraper for {firm_name} ({firm_data['type']}): {type(result).__name__} - {result}")
+                    if is_http:
+                        logging.error(f"Error in requests scraper for {firm_name} ({firm_data['type']}): {type(result).__name__} - {result}")
+                    else:
+                        logging.error(f"Critical failure during Playwright execution: {type(result).__name__} - {result}")
                 elif isinstance(result, list):
-                    if use_playwright and not result and firm_data['type'] == 'custom_site' and firm_name in PLAYWRIGHT_CONFIGS:
+                    if is_http and use_playwright and not result and firm_data['type'] == 'custom_site' and firm_name in PLAYWRIGHT_CONFIGS:
                         logging.info(f"{YELLOW}FALLBACK:{ENDC} Triggering Playwright for {firm_name} (Generic scraper found 0 jobs).")
-                        fallback_async_firms.append({'firm': firm_name})
+                        schedule_playwright({**firm_data, 'is_fallback': True})
                     elif result:
-                        all_jobs.extend(result)
+                        new_jobs = []
+                        for job in result:
+                            job_key = (job['firm'], job['link'])
+                            if job_key not in seen_jobs:
+                                seen_jobs.add(job_key)
+                                new_jobs.append(job)
+
+                        all_jobs.extend(new_jobs)
+                        write_jobs(new_jobs)
                 else:
                     logging.error(f"Unexpected result type for {firm_name}: {type(result)}. Skipping.")
-        except Exception as e:
-             logging.error(f"Critical error during synchronous task gathering: {e}")
-
-    if use_playwright:
-        de_duplicated_initial_firms = list({firm['firm']: firm for firm in initial_async_firms}.values())
 
-        final_async_firms_dict = {firm['firm']: firm for firm in de_duplicated_initial_firms + fallback_async_firms}
-
-        final_async_firms = list(final_async_firms_dict.values())
-
-
-        if final_async_firms:
-            logging.info(f"\n{BOLD}SCHEDULE:{ENDC} Scheduling {len(final_async_firms)} Playwright scrapers ({len(de_duplicated_initial_firms)} initial, {len(fallback_async_firms)} fallbacks)...")
-            try:
-                async_results: List[JobData] = await run_playwright_scrapers(final_async_firms)
-                all_jobs.extend(async_results)
-            except Exception as e:
-                logging.error(f"Critical failure during Playwright execution: {type(e).__name__} - {e}")
-    else:
-        logging.info("\n{BLUE}INFO:{ENDC} Skipping Playwright scraping as per user's request (HTML-only mode).")
+        if use_playwright:
+            if playwright_tasks:
+                logging.info(f"\n{BOLD}SCHEDULE:{ENDC} Finished {len(playwright_tasks)} Playwright scrapers ({initial_playwright_count} initial, {len(playwright_tasks) - initial_playwright_count} fallbacks).")
+        else:
+            logging.info(f"\n{BLUE}INFO:{ENDC} Skipping Playwright scraping as per user's request (HTML-only mode).")
 
     return all_jobs
 
@@ -1,31 +1,94 @@
 import asyncio
 from playwright.async_api import async_playwright, TimeoutError, Error as PlaywrightError
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 import random
-from urllib.parse import urljoin, urlparse
+from contextlib import asynccontextmanager
 from asyncio import timeout
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential_jitter, retry_if_exception, before_sleep_log
 
-PLAYWRIGHT_CONFIGS = {}
+from config import (
+    PLAYWRIGHT_CONFIGS, PLAYWRIGHT_USER_AGENTS, PLAYWRIGHT_BLOCKED_RESOURCE_TYPES, PLAYWRIGHT_WAIT_UNTIL,
+    MAX_RETRIES, RETRY_BACKOFF_INITIAL, RETRY_BACKOFF_MAX
+)
+from utils.rate_limiter import get_host_limiter
 
 JobData = Dict[str, str]
 
-async def __create_browser_page(p, stealth_options=None):
-    browser_type = random.choice([p.chromium, p.firefox])
-
-    context = await browser_type.launch(
+MAX_PLAYWRIGHT_TASK_TIME = 90
+
+_HTTP_PREFIXES = ('http://', 'https://')
+
+EXTRACT_JOB_CARDS_JS = r"""
+(cards, { titleSelector, locationSelector }) => cards.map(card => {
+    const clean = text => text ? text.replace(/\s+/g, ' ').trim() : null;
+    const titleElement = titleSelector === 'text' ? card : card.querySelector(titleSelector);
+    const linkElement = card.tagName === 'A' && card.getAttribute('href') ? card : card.querySelector('a');
+    const locationElement = locationSelector ? card.querySelector(locationSelector) : null;
+    return {
+        title: titleElement ? clean(titleElement.innerText) : null,
+        href: linkElement ? linkElement.href || null : null,
+        location: locationElement ? clean(locationElement.innerText.replace(/Location|:/g, '')) : null
+    };
+})
+"""
+
+def _is_retryable_playwright_error(exception: BaseException) -> bool:
+    if isinstance(exception, TimeoutError):
+        return True
+    return isinstance(exception, PlaywrightError) and ("net::ERR" in str(exception) or "NS_ERROR" in str(exception))
+
+async def __launch_browsers(p) -> List[Any]:
+    browsers = [await p.chromium.launch(
         headless=True,
+        chromium_sandbox=False,
         args=[
             '--no-sandbox',
             '--disable-setuid-sandbox',
+            '--disable-dev-shm-usage',
             '--disable-gpu',
-            '--window-size=1920,1080',
-            '--blink-settings=imagesEnabled=false'
+            '--window-size=1920,1080'
         ]
+    )]
+
+    try:
+        browsers.append(await p.firefox.launch(headless=True))
+    except PlaywrightError as e:
+        logging.warning(f"Firefox could not be launched, continuing with Chromium only: {e}")
+
+    return browsers
+
+@asynccontextmanager
+async def playwright_browsers() -> AsyncIterator[List[Any]]:
+    async with async_playwright() as p:
+        browsers = await __launch_browsers(p)
+        try:
+            yield browsers
+        finally:
+            for browser in browsers:
+                await browser.close()
+
+async def __create_browser_page(browsers, load_stylesheets=False, stealth_options=None):
+    browser = random.choice(browsers)
+    user_agents = PLAYWRIGHT_USER_AGENTS.get(browser.browser_type.name)
+    context = await browser.new_context(
+        user_agent=random.choice(user_agents) if user_agents else None,
+        extra_http_headers={'Accept-Language': 'en-US,en;q=0.9'},
+        viewport={"width": 1920, "height": 1080},
+        locale='en-US'
     )
 
+    blocked_types = PLAYWRIGHT_BLOCKED_RESOURCE_TYPES - {"stylesheet"} if load_stylesheets else PLAYWRIGHT_BLOCKED_RESOURCE_TYPES
+
+    async def block_resources(route):
+        if route.request.resource_type in blocked_types:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", block_resources)
+
     page = await context.new_page()
-    await page.set_viewport_size({"width": 1920, "height": 1080})
 
     return context, page
 
@@ -35,77 +98,72 @@ async def scrape_firm_playwright(
     job_card_selector: str,
     title_selector: str,
     location_selector: str | None,
-    p: Any
+    browsers: List[Any],
+    load_stylesheets: bool = False,
+    wait_until: str = PLAYWRIGHT_WAIT_UNTIL,
+    is_fallback: bool = False
 ) -> List[JobData]:
     context = None
     scraped_jobs: List[JobData] = []
-    is_fallback = firm_name not in PLAYWRIGHT_CONFIGS
     log_prefix = "FALLBACK" if is_fallback else "Playwright"
     logging.info(f"--- Starting concurrent scrape for {firm_name} (Type: {log_prefix}) ---")
 
     try:
-        context, page = await __create_browser_page(p)
+        context, page = await __create_browser_page(browsers, load_stylesheets=load_stylesheets)
+
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(MAX_RETRIES),
+            wait=wait_exponential_jitter(initial=RETRY_BACKOFF_INITIAL, max=RETRY_BACKOFF_MAX),
+            retry=retry_if_exception(_is_retryable_playwright_error),
+            before_sleep=before_sleep_log(logging.getLogger(), logging.WARNING),
+            reraise=True
+        ):
+            with attempt:
+                async with get_host_limiter(url):
+                    if page.url == "about:blank":
+                        await page.goto(url, wait_until=wait_until, timeout=60000)
+                    else:
+                        await page.reload(wait_until=wait_until, timeout=60000)
+                await asyncio.sleep(random.uniform(2, 4))
+
+                await page.wait_for_selector(job_card_selector, state="attached", timeout=15000)
+
+        job_cards = await page.eval_on_selector_all(
+            job_card_selector,
+            EXTRACT_JOB_CARDS_JS,
+            {"titleSelector": title_selector, "locationSelector": location_selector}
+        )
+
+        if not job_cards:
+            logging.warning(f"No job cards found using selector '{job_card_selector}' for {firm_name}.")
+            return []
 
-        await page.goto(url, wait_until="load", timeout=60000)
-        await asyncio.sleep(random.uniform(2, 4))
+        logging.info(f"Found {len(job_cards)} potential job listings for {firm_name}.")
+        display_name = firm_name.capitalize()
 
-        await page.wait_for_selector(job_card_selector, state="visible", timeout=30000) 
+        for i, card in enumerate(job_cards):
+            title = card.get("title")
+            link = card.get("href")
 
-        job_card_locators = await page.locator(job_card_selector).all()
+            if not title:
+                logging.warning(f"Job title missing for job card {i} on {firm_name}. Skipping.")
+                continue
 
-        if not job_card_locators:
-            logging.warning(f"No job cards found using selector '{job_card_selector}' for {firm_name}.")
-            return []
+            if not link:
+                logging.warning(f"Job link missing for job card {i} on {firm_name}. Skipping.")
+                continue
 
-        logging.info(f"Found {len(job_card_locators)} potential job listings for {firm_name}.")
-
-        for i, card_locator in enumerate(job_card_locators):
-            await asyncio.sleep(random.uniform(0.1, 0.5))
-            try:
-                title = await (card_locator.inner_text() if title_selector == "text" else card_locator.locator(title_selector).inner_text())
-
-                job_url = None
-
-                if await card_locator.evaluate("el => el.tagName === 'A'"):
-                    job_url = await card_locator.get_attribute("href")
-
-                if not job_url:
-                    job_link = card_locator.locator("a").first
-                    if job_link:
-                        job_url = await job_link.get_attribute("href")
-
-                if not job_url:
-                    logging.warning(f"Job link missing for job card {i} on {firm_name}. Skipping.")
-                    continue
-
-                location = "N/A"
-                if location_selector:
-                    try:
-                        location_element = card_locator.locator(location_selector).first
-                        location = (await location_element.all_inner_texts())[0].strip() if await location_element.count() > 0 else "N/A"
-                        location = location.replace('Location', '').replace(':', '').strip()
-                    except PlaywrightError:
-                        pass
-                
-                link = urljoin(url, job_url)
-
-                title_clean = title.strip().replace('\n', ' ')
-
-                if not (5 < len(title_clean) < 100 and urlparse(link).scheme in ('http', 'https')):
-                    logging.debug(f"Skipping job on {firm_name} due to invalid title or link: {title_clean}")
-                    continue
-
-                scraped_jobs.append({
-                    "firm": firm_name.capitalize(),
-                    "title": title_clean,
-                    "location": location.strip() or "N/A",
-                    "link": link
-                })
-
-            except Exception as e:
-                logging.error(f"Error processing job card {i} for {firm_name}: {e}")
+            if not (5 < len(title) < 100 and link.startswith(_HTTP_PREFIXES)):
+                logging.debug("Skipping job on %s due to invalid title or link: %s", firm_name, title)
                 continue
 
+            scraped_jobs.append({
+                "firm": display_name,
+                "title": title,
+                "location": card.get("location") or "N/A",
+                "link": link
+            })
+
     except TimeoutError:
         logging.error(f"Timeout occurred while loading or waiting for elements on {firm_name} ({url}).")
     except PlaywrightError as e:
@@ -125,67 +183,29 @@ async def scrape_firm_playwright(
     return scraped_jobs
 
 
-async def run_playwright_scrapers(firms_to_run: List[Dict[str, Any]]) -> List[JobData]:
-    all_results: List[JobData] = []
-
-    if not firms_to_run:
-        return all_results
+async def scrape_playwright_firm(firm_data: Dict[str, Any], browsers: List[Any], semaphore: asyncio.Semaphore) -> List[JobData]:
+    firm_name = firm_data['firm']
+    config = PLAYWRIGHT_CONFIGS.get(firm_name)
+    if not config:
+        logging.warning(f"Error: Playwright firm '{firm_name}' was passed but config is missing. Skipping.")
+        return []
 
     try:
-        from config import PLAYWRIGHT_CONFIGS
-        globals()['PLAYWRIGHT_CONFIGS'] = PLAYWRIGHT_CONFIGS
-    except ImportError:
-        logging.critical("Could not import PLAYWRIGHT_CONFIGS from config.py. Playwright scrapers cannot run.")
+        async with semaphore, timeout(MAX_PLAYWRIGHT_TASK_TIME):
+            return await scrape_firm_playwright(
+                firm_name=firm_name,
+                url=config["url"],
+                job_card_selector=config["job_card_selector"],
+                title_selector=config["title_selector"],
+                location_selector=config["location_selector"],
+                browsers=browsers,
+                load_stylesheets=config.get("load_stylesheets", False),
+                wait_until=config.get("wait_until", PLAYWRIGHT_WAIT_UNTIL),
+                is_fallback=firm_data.get('is_fallback', False)
+            )
+    except asyncio.TimeoutError:
+        logging.error(f"Critical Timeout: The entire Playwright task for {firm_name} exceeded the {MAX_PLAYWRIGHT_TASK_TIME} second limit.")
         return []
     except Exception as e:
-        logging.critical(f"Error during Playwright config import: {e}")
+        logging.error(f"Unexpected error during scraping {firm_name}: {e}")
         return []
-
-    unique_firms_dict = {firm['firm']: firm for firm in firms_to_run if 'firm' in firm}
-    unique_firms = list(unique_firms_dict.values())
-
-    async with async_playwright() as p:
-        tasks = []
-        MAX_PLAYWRIGHT_TASK_TIME = 90
-
-        for firm_data in unique_firms:
-            firm_name = firm_data.get('firm')
-            if not firm_name:
-                continue
-
-            config = PLAYWRIGHT_CONFIGS.get(firm_name)
-            if not config:
-                logging.warning(f"Error: Playwright firm '{firm_name}' was passed but config is missing. Skipping.")
-                continue
-
-            async def timed_scrape(firm_name=firm_name, config=config):
-                try:
-                    async with timeout(MAX_PLAYWRIGHT_TASK_TIME):
-                        return await scrape_firm_playwright(
-                            firm_name=firm_name,
-                            url=config["url"],
-                            job_card_selector=config["job_card_selector"],
-                            title_selector=config["title_selector"],
-                            location_selector=config["location_selector"],
-                            p=p
-                        )
-                except asyncio.TimeoutError:
-                    logging.error(f"Critical Timeout: The entire Playwright task for {firm_name} exceeded the {MAX_PLAYWRIGHT_TASK_TIME} second limit.")
-                    return []
-                except Exception as e:
-                    logging.error(f"Unexpected error during scraping {firm_name}: {e}")
-                    return []
-
-            tasks.append(timed_scrape())
-
-        logging.info(f"Running {len(tasks)} Playwright scraping tasks concurrently...")
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for result in results:
-            if isinstance(result, Exception):
-                logging.error(f"A concurrent Playwright task failed with a critical error: {result}")
-            elif isinstance(result, list):
-                all_results.extend(result)
-
-    return all_results
@@ -1,56 +1,169 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import re
+import aiohttp
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from tenacity import retry, stop_after_attempt, wait_exponential_jitter, retry_if_exception, before_sleep_log
+from selectolax.lexbor import LexborHTMLParser
 import logging
-from typing import List, Dict
-import time
-from urllib.parse import urljoin, urlparse
-from config import get_random_headers, REQUESTS_TIMEOUT
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urljoin
+from config import (
+    get_random_headers, REQUESTS_TIMEOUT, HTTP_CONNECTION_LIMIT, HTTP_CONNECTION_LIMIT_PER_HOST, DNS_CACHE_TTL,
+    HTTP_READ_CHUNK_SIZE, MAX_RESPONSE_BYTES,
+    MAX_RETRIES, RETRY_BACKOFF_INITIAL, RETRY_BACKOFF_MAX, RETRYABLE_STATUS_CODES
+)
+from utils.rate_limiter import get_host_limiter
+from utils.http_cache import CachedResponse, load_cached_response, save_cached_response, conditional_headers
 
 
 JobData = Dict[str, str]
 
-def scrape_greenhouse_standard(firm_name: str, url: str) -> List[JobData]:
-    logging.info(f"-> Starting scrape for {firm_name} (Type: greenhouse_standard)")
+GENERIC_JOB_SELECTORS = (
+    'a[href*="job"]', 'a[href*="careers"]', 'a[href*="role"]', 'div.job-listing',
+    'li.job-item', 'div.role-item', 'a[class*="job"]', 'div[class*="job"]'
+)
+GENERIC_JOB_SELECTOR = ', '.join(GENERIC_JOB_SELECTORS)
+
+_TITLE_BLOCKLIST_RE = re.compile(r'open role|career|alert|view all', re.IGNORECASE)
+
+_WS_RE = re.compile(r'\s+')
+
+_HTTP_PREFIXES = ('http://', 'https://')
+
+_backoff_wait = wait_exponential_jitter(initial=RETRY_BACKOFF_INITIAL, max=RETRY_BACKOFF_MAX)
+
+def _is_retryable_http_error(exception: BaseException) -> bool:
+    if isinstance(exception, aiohttp.ClientResponseError):
+        return exception.status in RETRYABLE_STATUS_CODES
+    return isinstance(exception, (aiohttp.ClientError, asyncio.TimeoutError))
+
+def _retry_after_seconds(exception: Optional[BaseException]) -> Optional[float]:
+    if not isinstance(exception, aiohttp.ClientResponseError) or not exception.headers:
+        return None
+
+    value = exception.headers.get('Retry-After')
+    if not value:
+        return None
 
-    session = requests.Session()
-    session.headers.update(get_random_headers())
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def _wait_retry_after_or_backoff(retry_state) -> float:
+    retry_after = _retry_after_seconds(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, RETRY_BACKOFF_MAX)
+    return _backoff_wait(retry_state)
+
+def create_http_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONNECTION_LIMIT,
+        limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=REQUESTS_TIMEOUT)
+    )
+
+async def _read_capped_body(response: aiohttp.ClientResponse, url: str) -> Tuple[bytes, bool]:
+    chunks: List[bytes] = []
+    size = 0
+    truncated = False
+
+    async for chunk in response.content.iter_chunked(HTTP_READ_CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= MAX_RESPONSE_BYTES:
+            logging.warning(f"Response from {url} reached the {MAX_RESPONSE_BYTES} byte limit. Parsing the first {size} bytes only and skipping the cache.")
+            truncated = True
+            break
+
+    return b''.join(chunks), truncated
+
+@retry(
+    stop=stop_after_attempt(MAX_RETRIES),
+    wait=_wait_retry_after_or_backoff,
+    retry=retry_if_exception(_is_retryable_http_error),
+    before_sleep=before_sleep_log(logging.getLogger(), logging.WARNING),
+    reraise=True
+)
+async def fetch_html(
+    session: aiohttp.ClientSession,
+    url: str,
+    cached: Optional[CachedResponse] = None
+) -> Tuple[Optional[bytes], Dict[str, str]]:
+    headers = get_random_headers()
+    headers.update(conditional_headers(cached))
+
+    async with get_host_limiter(url):
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                return None, {}
+            response.raise_for_status()
+            body, truncated = await _read_capped_body(response, url)
+            if truncated:
+                return body, {'etag': None, 'last_modified': None}
+            return body, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+
+async def scrape_greenhouse_standard(session: aiohttp.ClientSession, firm_name: str, url: str) -> List[JobData]:
+    logging.info(f"-> Starting scrape for {firm_name} (Type: greenhouse_standard)")
 
     jobs_list: List[JobData] = []
+    cached = load_cached_response(url)
 
     try:
-        response = session.get(url, timeout=REQUESTS_TIMEOUT)
-        response.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"HTTP Error {response.status_code} fetching {url}: {e}")
+        content, validators = await fetch_html(session, url, cached)
+    except aiohttp.ClientResponseError as e:
+        logging.error(f"HTTP Error {e.status} fetching {url}: {e.message}")
         return []
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Connection Error fetching {url}: {e}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"Connection Error fetching {url}: {type(e).__name__} {e}")
         return []
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    job_elements = soup.find_all('div', class_='opening')
+    if content is None:
+        logging.info(f"{firm_name} unchanged since last run (HTTP 304). Reusing {len(cached['jobs'])} cached jobs.")
+        return cached['jobs']
+
+    tree = LexborHTMLParser(content)
+    job_elements = tree.css('div.opening')
 
     if not job_elements:
         logging.warning(f"No job elements found for {firm_name}. Structure may be different or page is empty.")
         return []
 
+    display_name = firm_name.capitalize()
+
     for job_element in job_elements:
-        title_element = job_element.find('a')
-        location_element = job_element.find('span', class_='location')
+        title_element = job_element.css_first('a')
+        location_element = job_element.css_first('span.location')
 
         if title_element:
             try:
-                title = title_element.get_text(strip=True)
-                relative_link = title_element.get('href', '')
-                location = location_element.get_text(strip=True) if location_element else "N/A"
+                title = title_element.text(strip=True)
+                relative_link = title_element.attributes.get('href') or ''
+                location = location_element.text(strip=True) if location_element else "N/A"
 
                 link = urljoin(url, relative_link)
 
-                if not all([title, link, title.strip(), urlparse(link).scheme in ('http', 'https')]):
+                if not all([title, link, title.strip(), link.startswith(_HTTP_PREFIXES)]):
                     continue
 
                 jobs_list.append({
-                    'firm': firm_name.capitalize(),
+                    'firm': display_name,
                     'title': title,
                     'link': link,
                     'location': location
@@ -60,81 +173,69 @@ def scrape_greenhouse_standard(firm_name: str, url: str) -> List[JobData]:
                 continue
 
     logging.info(f"Found {len(jobs_list)} jobs for {firm_name}.")
+    save_cached_response(url, validators['etag'], validators['last_modified'], jobs_list)
     return jobs_list
 
-def scrape_custom_site_generic(firm_name: str, url: str) -> List[JobData]:
+async def scrape_custom_site_generic(session: aiohttp.ClientSession, firm_name: str, url: str) -> List[JobData]:
     logging.info(f"-> Starting scrape for {firm_name} (Type: custom_site - Generic Scraper Attempt)")
 
-    session = requests.Session()
-    session.headers.update(get_random_headers())
-
     jobs_list: List[JobData] = []
+    cached = load_cached_response(url)
 
     try:
-        response = session.get(url, timeout=REQUESTS_TIMEOUT)
-        response.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"HTTP Error {response.status_code} fetching {url}: {e}. Returning 0 jobs for potential fallback.")
+        content, validators = await fetch_html(session, url, cached)
+    except aiohttp.ClientResponseError as e:
+        logging.error(f"HTTP Error {e.status} fetching {url}: {e.message}. Returning 0 jobs for potential fallback.")
         return []
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Connection Error fetching {url}: {e}. Returning 0 jobs for potential fallback.")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logging.error(f"Connection Error fetching {url}: {type(e).__name__} {e}. Returning 0 jobs for potential fallback.")
         return []
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+    if content is None:
+        logging.info(f"{firm_name} unchanged since last run (HTTP 304). Reusing {len(cached['jobs'])} cached jobs.")
+        return cached['jobs']
 
-    potential_job_elements = (
-        soup.select('a[href*="job"]') + soup.select('a[href*="careers"]') +
-        soup.select('a[href*="role"]') + soup.select('div.job-listing') +
-        soup.select('li.job-item') + soup.select('div.role-item') +
-        soup.select('a[class*="job"]') + soup.select('div[class*="job"]')
-    )
+    tree = LexborHTMLParser(content)
 
-    unique_jobs = set()
+    potential_job_elements = sorted(tree.css(GENERIC_JOB_SELECTOR), key=lambda element: element.tag != 'a')
+    display_name = firm_name.capitalize()
+    seen_links = set()
 
     for element in potential_job_elements:
         link = None
         title = None
 
         try:
-            if element.name == 'a':
-                link = element.get('href')
-                title = element.get_text(strip=True)
-            else:
-                link_tag = element.find('a', href=True)
-                if link_tag:
-                    link = link_tag.get('href')
-                    title = ' '.join(element.get_text(strip=True).split())
-                else:
-                    continue
+            link_tag = element if element.tag == 'a' else None
+            title = _WS_RE.sub(' ', element.text(strip=True)).strip()
 
-            if not (title and link):
+            if not (5 < len(title) < 100) or _TITLE_BLOCKLIST_RE.search(title):
                 continue
 
-            full_link = urljoin(url, link)
+            if link_tag is None:
+                link_tag = element.css_first('a[href]')
+                if link_tag is None:
+                    continue
 
-            title = title.strip()
-            if not (5 < len(title) < 100):
+            link = link_tag.attributes.get('href')
+            if not link:
                 continue
 
-            if any(keyword in title.lower() for keyword in ['open role', 'career', 'alert', 'view all', 'view all jobs']):
-                continue
+            full_link = urljoin(url, link)
 
-            if urlparse(full_link).scheme not in ('http', 'https'):
+            if not full_link.startswith(_HTTP_PREFIXES) or full_link in seen_links:
                 continue
+            seen_links.add(full_link)
 
-            job_key = (title, full_link)
-
-            if job_key not in unique_jobs:
-                jobs_list.append({
-                    'firm': firm_name.capitalize(),
-                    'title': title,
-                    'link': full_link,
-                    'location': 'N/A'
-                })
-                unique_jobs.add(job_key)
+            jobs_list.append({
+                'firm': display_name,
+                'title': title,
+                'link': full_link,
+                'location': 'N/A'
+            })
 
         except Exception as e:
-            logging.debug(f"Error processing generic element for {firm_name}: {e}")
+            logging.debug("Error processing generic element for %s: %s", firm_name, e)
             continue
 
     if not jobs_list:
@@ -142,7 +243,5 @@ def scrape_custom_site_generic(firm_name: str, url: str) -> List[JobData]:
     else:
         logging.info(f"Found {len(jobs_list)} jobs for {firm_name}.")
 
-    import random
-    time.sleep(random.uniform(0.5, 1.5))
-
+    save_cached_response(url, validators['etag'], validators['last_modified'], jobs_list)
     return jobs_list
\ No newline at end of file
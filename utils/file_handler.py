@@ -2,13 +2,19 @@ import csv
 import pandas as pd
 import logging
 import os
-from typing import List, Dict
-from openpyxl.utils.dataframe import dataframe_to_rows
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Tuple, Callable, Iterator
+from xml.sax.saxutils import escape, quoteattr
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
 from datetime import datetime
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -16,77 +22,291 @@ from reportlab.lib.units import inch
 JobData = Dict[str, str]
 FirmConfig = Dict[str, str]
 
-def get_firm_list(csv_filename: str = 'firms.csv') -> List[FirmConfig]:
-    firms: List[FirmConfig] = []
-
-    if not os.path.exists(csv_filename):
-        logging.error(f"Error: The configuration file '{csv_filename}' was not found.")
-        return []
-
+JOB_FIELDS = ['firm', 'title', 'location', 'link']
+
+EXPORT_HEADERS = ('Firm', 'Job Title', 'Location', 'Link')
+
+ExportRow = Tuple[str, str, str, str]
+
+EXPORT_BUFFER_SIZE = 1 << 20
+
+_HTTP_PREFIXES = ('http://', 'https://')
+
+HEADER_FONT = Font(bold=True, size=12)
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+LINK_FONT = Font(color='0000FF', underline='single')
+
+_SAMPLE_STYLES = getSampleStyleSheet()
+NORMAL_STYLE = _SAMPLE_STYLES['Normal']
+TITLE_STYLE = ParagraphStyle(
+    name='ReportTitle',
+    parent=_SAMPLE_STYLES['Title'],
+    alignment=1
+)
+CELL_STYLE = ParagraphStyle(
+    name='CellText',
+    parent=NORMAL_STYLE,
+    fontName='Helvetica',
+    fontSize=8,
+    leading=10,
+)
+LINK_STYLE = ParagraphStyle(
+    name='LinkStyle',
+    parent=CELL_STYLE,
+    textColor=colors.blue,
+    underline=False
+)
+
+PDF_MAX_PAGE_ROWS = 60
+PDF_FRAME_PADDING = 6
+
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2a4f6d')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dddddd')),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [None, colors.HexColor('#f5f5f5')]),
+])
+
+@lru_cache(maxsize=8)
+def _load_firm_list(csv_filename: str, mtime_ns: int) -> Tuple[FirmConfig, ...]:
     try:
-        with open(csv_filename, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            required_cols = ['firm_name', 'url', 'platform_type']
-            if not all(col in reader.fieldnames for col in required_cols):
-                logging.error(f"CSV missing required columns. Found: {reader.fieldnames}")
-                return []
-
-            for row in reader:
-                firm_name = row.get('firm_name', '').strip()
-                url = row.get('url', '').strip()
-                platform_type = row.get('platform_type', '').strip().lower()
-
-                if firm_name and url and platform_type:
-                    clean_type = platform_type.replace('_standard', '').replace('_custom', '')
-                    firms.append({'firm': firm_name, 'url': url, 'type': clean_type})
-                else:
-                    logging.warning(f"Skipping row due to missing data: {row}")
+        raw_df = pd.read_csv(
+            csv_filename, dtype=str, keep_default_na=False, encoding='utf-8', on_bad_lines='warn'
+        ).fillna('')
+        required_cols = ['firm_name', 'url', 'platform_type']
+        if not all(col in raw_df.columns for col in required_cols):
+            logging.error(f"CSV missing required columns. Found: {list(raw_df.columns)}")
+            return ()
+
+        df = raw_df[required_cols].apply(lambda col: col.str.strip())
+        df['platform_type'] = df['platform_type'].str.lower()
+
+        missing = (df == '').any(axis=1)
+        for row in raw_df[missing].to_dict('records'):
+            logging.warning(f"Skipping row due to missing data: {row}")
+
+        clean_types = df['platform_type'].str.replace('_standard', '', regex=False).str.replace('_custom', '', regex=False)
+        firms = tuple(
+            df.assign(platform_type=clean_types)[~missing]
+            .rename(columns={'firm_name': 'firm', 'platform_type': 'type'})
+            .to_dict('records')
+        )
 
         logging.info(f"Successfully loaded {len(firms)} valid firm(s) from {csv_filename}.")
         return firms
 
     except Exception as e:
         logging.error(f"Unexpected error reading firm CSV: {e}")
+        return ()
+
+
+def get_firm_list(csv_filename: str = 'firms.csv') -> List[FirmConfig]:
+    try:
+        mtime_ns = os.stat(csv_filename).st_mtime_ns
+    except FileNotFoundError:
+        logging.error(f"Error: The configuration file '{csv_filename}' was not found.")
         return []
 
+    firms = _load_firm_list(csv_filename, mtime_ns)
+    return [dict(firm) for firm in firms]
+
+
+@contextmanager
+def job_stream_writer(filename: str = "output/jobs.csv") -> Iterator[Callable[[List[JobData]], None]]:
+    try:
+        output_dir = os.path.dirname(filename)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        file = open(filename, mode='w', newline='', encoding='utf-8')
+    except OSError as e:
+        logging.error(f"Could not open job stream file '{filename}': {e}. Jobs will only be exported at the end.")
+        yield lambda jobs: None
+        return
+
+    with file:
+        writer = csv.DictWriter(file, fieldnames=JOB_FIELDS, extrasaction='ignore', restval='')
+        writer.writeheader()
+
+        def write_jobs(jobs: List[JobData]):
+            writer.writerows(jobs)
+            file.flush()
+
+        yield write_jobs
+    logging.info(f"Streamed job records to {filename}")
+
 
 def validate_job_data(jobs_data: List[JobData]) -> List[JobData]:
-    valid_jobs: List[JobData] = []
-    unique_jobs = set()
-    dropped_count = 0
-
-    for job in jobs_data:
-        firm = job.get('firm', '').strip()
-        title = job.get('title', '').strip()
-        location = job.get('location', '').strip()
-        link = job.get('link', '').strip()
-
-        if not (firm and title and link):
-            logging.warning(f"Dropping job (missing fields): {job}")
-            dropped_count += 1
-            continue
+    if not jobs_data:
+        return []
 
-        if not link.startswith(('http://', 'https://')):
-            logging.warning(f"Dropping job (invalid link): {link}")
-            dropped_count += 1
-            continue
+    df = pd.DataFrame({field: [job.get(field) or '' for job in jobs_data] for field in JOB_FIELDS}, copy=False)
+    df = df.apply(lambda col: col.astype(str).str.strip())
 
-        key = (firm.lower(), title.lower(), location.lower())
-        if key in unique_jobs:
-            dropped_count += 1
-            continue
+    missing = (df[['firm', 'title', 'link']] == '').any(axis=1)
+    invalid_link = ~missing & ~df['link'].str.startswith(_HTTP_PREFIXES)
+
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for i in df.index[missing]:
+            logging.debug("Dropping job (missing fields): %s", jobs_data[i])
+        for link in df.loc[invalid_link, 'link']:
+            logging.debug("Dropping job (invalid link): %s", link)
 
-        valid_jobs.append({
-            "firm": firm,
-            "title": title,
-            "location": location or "N/A",
-            "link": link
-        })
-        unique_jobs.add(key)
+    df = df[~(missing | invalid_link)]
+    duplicated = df[['firm', 'title', 'location']].apply(lambda col: col.str.lower()).duplicated()
+    df = df[~duplicated]
 
+    missing_count = int(missing.sum())
+    invalid_link_count = int(invalid_link.sum())
+    duplicate_count = int(duplicated.sum())
+    dropped_count = missing_count + invalid_link_count + duplicate_count
     if dropped_count:
-        logging.info(f"Validation complete. Dropped {dropped_count} jobs.")
-    return valid_jobs
+        logging.info(
+            "Validation complete. Dropped %d jobs (missing fields: %d, invalid link: %d, duplicates: %d).",
+            dropped_count, missing_count, invalid_link_count, duplicate_count
+        )
+    return df.assign(location=df['location'].replace('', 'N/A')).to_dict('records')
+
+
+def _write_xlsx(rows: List[ExportRow], filename: str):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Scraped Jobs")
+
+    column_widths = [
+        max(len(column), max(map(len, values)))
+        for column, values in zip(EXPORT_HEADERS, zip(*rows))
+    ]
+
+    header_row = []
+    for col_idx, (column, max_len) in enumerate(zip(EXPORT_HEADERS, column_widths), start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 5, 75)
+
+        cell = WriteOnlyCell(ws, value=column)
+        cell.font = HEADER_FONT
+        cell.alignment = HEADER_ALIGNMENT
+        header_row.append(cell)
+    ws.append(header_row)
+
+    for firm, title, location, link in rows:
+        if link.startswith(_HTTP_PREFIXES):
+            cell = WriteOnlyCell(ws, value=link)
+            cell.hyperlink = link
+            cell.font = LINK_FONT
+            link = cell
+        ws.append((firm, title, location, link))
+
+    meta_ws = wb.create_sheet("Metadata")
+    meta_ws.column_dimensions['A'].width = 20
+    meta_ws.column_dimensions['B'].width = 25
+    for label, value in (
+        ("Generated", datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        ("Total Jobs", len(rows)),
+        ("Firms", len({row[0] for row in rows}))
+    ):
+        label_cell = WriteOnlyCell(meta_ws, value=label)
+        label_cell.font = HEADER_FONT
+        meta_ws.append((label_cell, value))
+
+    with open(filename, 'wb', buffering=EXPORT_BUFFER_SIZE) as xlsx_file:
+        wb.save(xlsx_file)
+    logging.info(f"Excel exported to {filename}")
+
+
+def _frame_sized_tables(pdf_rows: List[List[Paragraph]], col_widths: List[float], frame_width: float, first_frame_height: float, frame_height: float) -> List:
+    header = list(EXPORT_HEADERS)
+    elements = []
+    start = 0
+    avail_height = first_frame_height
+
+    while start < len(pdf_rows):
+        window = Table(
+            [header] + pdf_rows[start:start + PDF_MAX_PAGE_ROWS],
+            colWidths=col_widths,
+            repeatRows=1,
+            style=PDF_TABLE_STYLE
+        )
+        parts = window.split(frame_width, avail_height)
+        if not parts and avail_height < frame_height:
+            elements.append(PageBreak())
+            avail_height = frame_height
+            continue
+
+        page_table = parts[0] if parts else window
+        start += len(page_table._cellvalues) - 1
+        elements.append(page_table)
+        if start < len(pdf_rows):
+            elements.append(PageBreak())
+        avail_height = frame_height
+
+    return elements
+
+def _write_pdf(rows: List[ExportRow], pdf_filename: str):
+    PAGE_WIDTH, PAGE_HEIGHT = A4
+    LEFT_MARGIN = 0.5 * inch
+    RIGHT_MARGIN = 0.5 * inch
+    TOP_MARGIN = inch
+    BOTTOM_MARGIN = inch
+    TABLE_WIDTH = PAGE_WIDTH - LEFT_MARGIN - RIGHT_MARGIN
+    FRAME_WIDTH = TABLE_WIDTH - 2 * PDF_FRAME_PADDING
+    FRAME_HEIGHT = PAGE_HEIGHT - TOP_MARGIN - BOTTOM_MARGIN - 2 * PDF_FRAME_PADDING
+
+    elements = []
+
+    elements.append(Paragraph("Scraped Job Listings", TITLE_STYLE))
+    elements.append(Paragraph(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", NORMAL_STYLE))
+    elements.append(Spacer(1, 18))
+
+    col_widths = [
+        TABLE_WIDTH * 0.15, 
+        TABLE_WIDTH * 0.35, 
+        TABLE_WIDTH * 0.20, 
+        TABLE_WIDTH * 0.30
+    ]
+    
+    pdf_rows = []
+    paragraph_cache: Dict[Tuple[int, str], Paragraph] = {}
+
+    def cached_paragraph(column: int, value: str) -> Paragraph:
+        paragraph = paragraph_cache.get((column, value))
+        if paragraph is None:
+            paragraph = paragraph_cache[(column, value)] = Paragraph(escape(value), CELL_STYLE)
+        return paragraph
+
+    for firm, title, location, link in rows:
+        if link.startswith(_HTTP_PREFIXES):
+            link_paragraph = Paragraph(f'<a href={quoteattr(link)}>{escape(link)}</a>', LINK_STYLE)
+        else:
+            link_paragraph = Paragraph(escape(link), CELL_STYLE)
+
+        pdf_rows.append([
+            cached_paragraph(0, firm),
+            Paragraph(escape(title), CELL_STYLE),
+            cached_paragraph(2, location),
+            link_paragraph
+        ])
+
+    title_height = sum(
+        element.wrap(FRAME_WIDTH, FRAME_HEIGHT)[1] + element.getSpaceBefore() + element.getSpaceAfter()
+        for element in elements
+    )
+    elements.extend(_frame_sized_tables(pdf_rows, col_widths, FRAME_WIDTH, FRAME_HEIGHT - title_height, FRAME_HEIGHT))
+
+    with open(pdf_filename, 'wb', buffering=EXPORT_BUFFER_SIZE) as pdf_file:
+        doc = SimpleDocTemplate(
+            pdf_file,
+            pagesize=A4,
+            leftMargin=LEFT_MARGIN,
+            rightMargin=RIGHT_MARGIN,
+            topMargin=TOP_MARGIN,
+            bottomMargin=BOTTOM_MARGIN
+        )
+        doc.build(elements)
+    logging.info(f"PDF exported to {pdf_filename}")
 
 
 def export_to_excel(jobs_data: List[JobData], filename: str = "output/jobs.xlsx"):
@@ -96,121 +316,23 @@ def export_to_excel(jobs_data: List[JobData], filename: str = "output/jobs.xlsx"
 
     try:
         output_dir = os.path.dirname(filename)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-
-        df = pd.DataFrame(jobs_data)
-        for col in ['firm', 'title', 'location', 'link']:
-            if col not in df.columns:
-                df[col] = ''
-        df = df[['firm', 'title', 'location', 'link']]
-        df.columns = ['Firm', 'Job Title', 'Location', 'Link']
-        df = df.sort_values(by=['Firm', 'Job Title']).reset_index(drop=True)
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Scraped Jobs"
-
-        for r_idx, row in enumerate(dataframe_to_rows(df, header=True, index=False)):
-            ws.append(row)
-            if r_idx == 0:
-                for cell in ws[1]:
-                    cell.font = Font(bold=True, size=12)
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        for col in ws.columns:
-            max_len = max(len(str(c.value)) if c.value else 0 for c in col)
-            col_letter = col[0].column_letter
-            ws.column_dimensions[col_letter].width = min(max_len + 5, 75)
-            if col[0].value == 'Link':
-                for cell in col[1:]:
-                    if cell.value.startswith(('http://', 'https://')):
-                        cell.hyperlink = cell.value
-                        cell.font = Font(color='0000FF', underline='single')
-
-        wb.save(filename)
-        logging.info(f"Excel exported to {filename}")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
 
-        pdf_filename = filename.replace('.xlsx', '.pdf')
-        
-        PAGE_WIDTH, PAGE_HEIGHT = A4
-        LEFT_MARGIN = 0.5 * inch
-        RIGHT_MARGIN = 0.5 * inch
-        TABLE_WIDTH = PAGE_WIDTH - LEFT_MARGIN - RIGHT_MARGIN
-
-        doc = SimpleDocTemplate(
-            pdf_filename, 
-            pagesize=A4, 
-            leftMargin=LEFT_MARGIN,
-            rightMargin=RIGHT_MARGIN
-        )
-        elements = []
-
-        styles = getSampleStyleSheet()
-        cell_style = ParagraphStyle(
-            name='CellText',
-            parent=styles['Normal'],
-            fontName='Helvetica',
-            fontSize=8,
-            leading=10,
-        )
-        link_style = ParagraphStyle(
-            name='LinkStyle',
-            parent=cell_style,
-            textColor=colors.blue,
-            underline=False
-        )
-        title_style = styles['Title']
-        title_style.alignment = 1
-
-        elements.append(Paragraph("Scraped Job Listings", title_style))
-        elements.append(Paragraph(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-        elements.append(Spacer(1, 18))
-
-        col_widths = [
-            TABLE_WIDTH * 0.15, 
-            TABLE_WIDTH * 0.35, 
-            TABLE_WIDTH * 0.20, 
-            TABLE_WIDTH * 0.30
-        ]
-        
-        PDF_COLUMNS = ['Firm', 'Job Title', 'Location', 'Link']
-        
-        pdf_data = [PDF_COLUMNS] 
-        for _, row in df[PDF_COLUMNS].iterrows(): 
-            pdf_row = []
-            for col_name in PDF_COLUMNS: 
-                val = str(row[col_name]) if row[col_name] else ''
-                if col_name == 'Link' and val.startswith(('http://', 'https://')):
-                    paragraph = Paragraph(f'<a href="{val}">{val}</a>', link_style)
-                    pdf_row.append(paragraph)
-                else:
-                    pdf_row.append(Paragraph(val, cell_style))
-            pdf_data.append(pdf_row)
-
-        table = Table(pdf_data, colWidths=col_widths, repeatRows=1) 
-        
-        style_commands = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2a4f6d')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dddddd')),
+        rows: List[ExportRow] = [
+            (job['firm'], job['title'], job.get('location') or '', job['link'])
+            for job in sorted(jobs_data, key=itemgetter('firm', 'title'))
         ]
 
-        for i in range(1, len(pdf_data)):
-            if i % 2 == 0:
-                style_commands.append(('BACKGROUND', (0, i), (-1, i), colors.HexColor('#f5f5f5')))
-
-        table.setStyle(TableStyle(style_commands))
+        pdf_filename = filename.replace('.xlsx', '.pdf')
 
-        elements.append(table)
-        doc.build(elements)
-        logging.info(f"PDF exported to {pdf_filename}")
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(_write_xlsx, rows, filename), pool.submit(_write_pdf, rows, pdf_filename)]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"Critical error during Excel/PDF export: {e}")
 
     except Exception as e:
         logging.error(f"Critical error during Excel/PDF export: {e}")
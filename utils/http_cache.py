@@ -0,0 +1,52 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from config import HTTP_CACHE_DIR
+
+JobData = Dict[str, str]
+CachedResponse = Dict[str, Any]
+
+def _cache_path(url: str) -> str:
+    return os.path.join(HTTP_CACHE_DIR, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json")
+
+def load_cached_response(url: str) -> Optional[CachedResponse]:
+    try:
+        with open(_cache_path(url), mode='r', encoding='utf-8') as file:
+            cached = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+        return None
+
+    if not isinstance(cached, dict) or not isinstance(cached.get('jobs'), list):
+        return None
+    if not (cached.get('etag') or cached.get('last_modified')):
+        return None
+    return cached
+
+def save_cached_response(url: str, etag: Optional[str], last_modified: Optional[str], jobs: List[JobData]):
+    if not (etag or last_modified):
+        return
+
+    path = _cache_path(url)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, mode='w', encoding='utf-8') as file:
+            json.dump({'url': url, 'etag': etag, 'last_modified': last_modified, 'jobs': jobs}, file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not write cache entry for {url}: {e}")
+
+def conditional_headers(cached: Optional[CachedResponse]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    return headers
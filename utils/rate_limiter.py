@@ -0,0 +1,12 @@
+from collections import defaultdict
+from typing import Dict
+from urllib.parse import urlparse
+
+from aiolimiter import AsyncLimiter
+
+from config import HOST_RATE_LIMIT, HOST_RATE_PERIOD
+
+_host_limiters: Dict[str, AsyncLimiter] = defaultdict(lambda: AsyncLimiter(HOST_RATE_LIMIT, HOST_RATE_PERIOD))
+
+def get_host_limiter(url: str) -> AsyncLimiter:
+    return _host_limiters[urlparse(url).netloc.lower()]